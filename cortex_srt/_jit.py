@@ -0,0 +1,16 @@
+# _jit.py
+# Optional numba support shared by the modules with compiled kernels. Without
+# numba, njit leaves functions as plain Python and prange is range.
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+
+        return decorator
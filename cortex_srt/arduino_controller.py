@@ -1,5 +1,6 @@
 # arduino_controller.py
 import serial
+import select
 import threading
 import queue
 import time
@@ -8,7 +9,8 @@ import time
 class ArduinoController:
     def __init__(self, port="/dev/ttyACM0", baudrate=115200):
         try:
-            self.serial = serial.Serial(port, baudrate, timeout=1)
+            # write_timeout caps how long a write can stall the comm thread
+            self.serial = serial.Serial(port, baudrate, timeout=1, write_timeout=0.1)
             time.sleep(2)  # Wait for Arduino to initialize
             print(f"Connected to Arduino on {port}")
         except:
@@ -17,6 +19,18 @@ class ArduinoController:
 
         self.command_queue = queue.Queue()
         self.running = True
+        self._last_laser = None
+        self.debug = False  # Print every command sent (once per frame)
+
+        # select() needs a file descriptor, which pyserial only has on POSIX.
+        # On Windows fileno() exists (io.RawIOBase) but raises
+        # io.UnsupportedOperation, so writes skip the select step there.
+        self._serial_fd = None
+        if self.serial:
+            try:
+                self._serial_fd = self.serial.fileno()
+            except (AttributeError, OSError, ValueError):
+                self._serial_fd = None
 
         # Start communication thread
         self.comm_thread = threading.Thread(target=self._communication_loop)
@@ -24,25 +38,84 @@ class ArduinoController:
         self.comm_thread.start()
 
     def _communication_loop(self):
-        while self.running:
-            if not self.command_queue.empty():
-                command = self.command_queue.get()
-                if self.serial and self.serial.is_open:
-                    try:
-                        self.serial.write(command.encode())
-                        self.serial.flush()
-                    except:
-                        print("Error sending command to Arduino")
-            time.sleep(0.01)  # 100Hz update rate
+        command = None  # Newest command not yet written to the port
+        stop = False
+        while not stop:
+            if command is None:
+                try:
+                    item = self.command_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if not self.running:
+                        break
+                    continue
+                # None is the shutdown sentinel queued by close()
+                if item is None:
+                    stop = True
+                else:
+                    command = item
+
+            # Only the newest target is actionable, drop anything older
+            command, stop_requested = self._latest_command(command)
+            stop = stop or stop_requested
+            if command is None:
+                continue
+            if not (self.serial and self.serial.is_open):
+                command = None
+                continue
+
+            # While the port is backed up, keep the command pending so newer
+            # ones replace it instead of blocking inside write()
+            if not stop and not self._writable():
+                continue
+
+            try:
+                # No flush here, the OS buffers writes; close() flushes
+                self.serial.write(command)
+            except:
+                print("Error sending command to Arduino")
+            command = None
+
+    def _latest_command(self, command):
+        """Drain the queue, returning the newest command and whether to stop"""
+        stop = False
+        while True:
+            try:
+                pending = self.command_queue.get_nowait()
+            except queue.Empty:
+                return command, stop
+            if pending is None:
+                stop = True
+            else:
+                command = pending
+
+    def _writable(self, timeout=0.01):
+        if self._serial_fd is None:
+            return True
+        _, writable, _ = select.select([], [self._serial_fd], [], timeout)
+        return bool(writable)
 
     def send_command(self, pan_degrees, tilt_degrees, laser):
         """Send command in format: '+2.5:-3.5:0'"""
-        command = f"{pan_degrees:+.1f}:{tilt_degrees:+.1f}:{laser}\n"
+        # Pan/tilt are deltas, so only a zero move that leaves the laser
+        # unchanged is a no-op (0.1 degree is the resolution on the wire)
+        if (
+            abs(pan_degrees) < 0.05
+            and abs(tilt_degrees) < 0.05
+            and laser == self._last_laser
+        ):
+            return
+        self._last_laser = laser
+
+        command = b"%+.1f:%+.1f:%d\n" % (pan_degrees, tilt_degrees, laser)
         self.command_queue.put(command)
-        print(f"Command sent: {command.strip()}")
+        if self.debug:
+            print(f"Command sent: {command.strip().decode()}")
 
     def close(self):
         self.running = False
-        self.comm_thread.join()
+        self.command_queue.put(None)  # Wake the comm thread immediately
+        # Bounded wait, a wedged port must not hang shutdown
+        self.comm_thread.join(timeout=1.0)
         if self.serial and self.serial.is_open:
+            self.serial.flush()
             self.serial.close()
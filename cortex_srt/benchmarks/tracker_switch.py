@@ -1,15 +1,75 @@
 import cv2
+import csv
+import os
 import time
+import threading
+import queue
 import numpy as np
 from collections import deque
-import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to plain Python
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def _iou_scalar(x1, y1, w1, h1, x2, y2, w2, h2):
+    xi1 = max(x1, x2)
+    yi1 = max(y1, y2)
+    xi2 = min(x1 + w1, x2 + w2)
+    yi2 = min(y1 + h1, y2 + h2)
+
+    if xi2 <= xi1 or yi2 <= yi1:
+        return 0.0
+
+    intersection_area = (xi2 - xi1) * (yi2 - yi1)
+
+    box1_area = w1 * h1
+    box2_area = w2 * h2
+    union_area = box1_area + box2_area - intersection_area
+
+    return intersection_area / union_area
+
+
+# Compile at import so the first tracked frame doesn't pay the JIT latency
+_iou_scalar(0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 1.0)
+
+
+CSV_HEADER = [
+    "frame",
+    "algorithm",
+    "fps",
+    "ground_truth_x",
+    "ground_truth_y",
+    "ground_truth_w",
+    "ground_truth_h",
+    "predicted_x",
+    "predicted_y",
+    "predicted_w",
+    "predicted_h",
+    "iou",
+    "success",
+]
 
 
 # --- Simplified CameraManager (for testing with video file or webcam) ---
 class CameraManager:
     def __init__(self, source=0, rotate_angle=0):
         if isinstance(source, str):
-            self.cap = cv2.VideoCapture(source)  # Use video file
+            # Use video file, decoded on the GPU through FFmpeg when possible
+            self.cap = cv2.VideoCapture(
+                source,
+                cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+            )
+            if not self.cap.isOpened():
+                self.cap = cv2.VideoCapture(source)
         else:
             self.cap = cv2.VideoCapture(source)  # Use webcam index
 
@@ -18,8 +78,15 @@ class CameraManager:
 
         self.rotate_angle = rotate_angle
 
-    def get_frame(self):
-        ret, frame = self.cap.read()
+    def get_frame(self, skip=0):
+        # Grab (without decoding) `skip` frames before decoding the next one
+        for _ in range(skip):
+            if not self.cap.grab():
+                return None
+
+        if not self.cap.grab():
+            return None
+        ret, frame = self.cap.retrieve()
         if not ret:
             return None
 
@@ -37,67 +104,96 @@ class CameraManager:
 
 
 # --- TrackerFactory (from original code) ---
+def _resolve_tracker(name):
+    # Prefer the legacy module (MOSSE only lives there on OpenCV 4.5+)
+    legacy = getattr(cv2, "legacy", None)
+    return getattr(legacy, name, None) or getattr(cv2, name, None)
+
+
+# Constructors are resolved once at import, missing ones are None
+_TRACKER_CTORS = {
+    "CSRT": getattr(cv2, "TrackerCSRT_create", None),
+    "KCF": getattr(cv2, "TrackerKCF_create", None),
+    "MIL": getattr(cv2, "TrackerMIL_create", None),
+    "MOSSE": _resolve_tracker("TrackerMOSSE_create"),
+}
+
+
 class TrackerFactory:
     def create_tracker(self, algorithm: str):
-        if algorithm == "CSRT":
-            return cv2.TrackerCSRT_create()
-        elif algorithm == "KCF":
-            return cv2.TrackerKCF_create()
-        elif algorithm == "MIL":
-            return cv2.TrackerMIL_create()
-        elif algorithm == "MOSSE":
-            try:
-                return cv2.legacy.TrackerMOSSE_create()
-            except AttributeError:
-                try:
-                    return cv2.TrackerMOSSE_create()
-                except AttributeError:
-                    raise ValueError(
-                        f"MOSSE tracker not available in this OpenCV version"
-                    )
-        else:
-            raise ValueError(f"Unknown tracking algorithm: {algorithm}")
+        ctor = _TRACKER_CTORS.get(algorithm)
+        if ctor is not None:
+            return ctor()
+        if algorithm in _TRACKER_CTORS:
+            raise ValueError(
+                f"{algorithm} tracker not available in this OpenCV version"
+            )
+        raise ValueError(f"Unknown tracking algorithm: {algorithm}")
 
 
 # --- TrackerAnalytics (from original code, with minor adjustments for direct use) ---
 class TrackerAnalytics:
-    def __init__(self, window_size=100):
+    def __init__(self, window_size=100, filename="tracker_performance_data.csv"):
         self.window_size = window_size
         self.fps_history = deque(maxlen=window_size)
         self.accuracy_history = deque(maxlen=window_size)
+        # Running sums over the history windows, for O(1) means
+        self._fps_sum = 0.0
+        self._accuracy_sum = 0.0
         self.tracking_time = {}
         self.algorithm_stats = {}
-        self.all_frame_data = []  # To store data for CSV
+
+        # Per-frame data is streamed to the CSV so memory stays bounded. The
+        # file is opened on the first row, so a run that records nothing does
+        # not truncate earlier results.
+        self.filename = filename
+        self._file = None
+        self._writer = None
 
     def update_fps(self, fps):
+        if len(self.fps_history) == self.window_size:
+            self._fps_sum -= self.fps_history[0]
         self.fps_history.append(fps)
+        self._fps_sum += fps
 
     def update_accuracy(self, ground_truth_bbox, predicted_bbox):
         if ground_truth_bbox is None or predicted_bbox is None:
-            return
+            return None
 
         iou = self.calculate_iou(ground_truth_bbox, predicted_bbox)
+        if len(self.accuracy_history) == self.window_size:
+            self._accuracy_sum -= self.accuracy_history[0]
         self.accuracy_history.append(iou)
+        self._accuracy_sum += iou
+        return iou
 
-    def calculate_iou(self, bbox1, bbox2):
-        x1, y1, w1, h1 = bbox1
-        x2, y2, w2, h2 = bbox2
+    @staticmethod
+    def calculate_iou_batch(boxes_a, boxes_b):
+        """IoU matrix (N, M) for boxes in xywh, like calculate_iou"""
+        a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+        b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
 
-        xi1 = max(x1, x2)
-        yi1 = max(y1, y2)
-        xi2 = min(x1 + w1, x2 + w2)
-        yi2 = min(y1 + h1, y2 + h2)
+        # xywh -> top-left / bottom-right corners
+        tl_a, br_a = a[:, :2], a[:, :2] + a[:, 2:]
+        tl_b, br_b = b[:, :2], b[:, :2] + b[:, 2:]
 
-        if xi2 <= xi1 or yi2 <= yi1:
-            return 0.0
+        tl = np.maximum(tl_a[:, None, :], tl_b[None, :, :])
+        br = np.minimum(br_a[:, None, :], br_b[None, :, :])
+        inter = np.prod(np.clip(br - tl, 0, None), axis=2)
 
-        intersection_area = (xi2 - xi1) * (yi2 - yi1)
+        area_a = a[:, 2] * a[:, 3]
+        area_b = b[:, 2] * b[:, 3]
+        union = area_a[:, None] + area_b[None, :] - inter
 
-        box1_area = w1 * h1
-        box2_area = w2 * h2
-        union_area = box1_area + box2_area - intersection_area
+        return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
 
-        return intersection_area / union_area
+    def calculate_iou(self, bbox1, bbox2):
+        x1, y1, w1, h1 = bbox1
+        x2, y2, w2, h2 = bbox2
+        return _iou_scalar(
+            float(x1), float(y1), float(w1), float(h1),
+            float(x2), float(y2), float(w2), float(h2),
+        )
 
     def start_tracking(self, algorithm):
         self.tracking_time[algorithm] = time.time()
@@ -116,41 +212,48 @@ class TrackerAnalytics:
             stats = self.algorithm_stats[algorithm]
             stats["total_time"] += duration
             stats["count"] += 1
-            stats["avg_fps"] = np.mean(self.fps_history) if self.fps_history else 0
-            stats["avg_accuracy"] = (
-                np.mean(self.accuracy_history) if self.accuracy_history else 0
+            stats["avg_fps"] = self._fps_sum / max(1, len(self.fps_history))
+            stats["avg_accuracy"] = self._accuracy_sum / max(
+                1, len(self.accuracy_history)
             )
 
     def record_frame_data(
-        self, frame_num, algorithm, fps, ground_truth_bbox, predicted_bbox, success
+        self,
+        frame_num,
+        algorithm,
+        fps,
+        ground_truth_bbox,
+        predicted_bbox,
+        success,
+        iou=None,
     ):
-        iou = (
-            self.calculate_iou(ground_truth_bbox, predicted_bbox)
-            if ground_truth_bbox and predicted_bbox
-            else 0.0
-        )
-        self.all_frame_data.append(
-            {
-                "frame": frame_num,
-                "algorithm": algorithm,
-                "fps": fps,
-                "ground_truth_x": ground_truth_bbox[0] if ground_truth_bbox else -1,
-                "ground_truth_y": ground_truth_bbox[1] if ground_truth_bbox else -1,
-                "ground_truth_w": ground_truth_bbox[2] if ground_truth_bbox else -1,
-                "ground_truth_h": ground_truth_bbox[3] if ground_truth_bbox else -1,
-                "predicted_x": predicted_bbox[0] if predicted_bbox else -1,
-                "predicted_y": predicted_bbox[1] if predicted_bbox else -1,
-                "predicted_w": predicted_bbox[2] if predicted_bbox else -1,
-                "predicted_h": predicted_bbox[3] if predicted_bbox else -1,
-                "iou": iou,
-                "success": success,
-            }
-        )
-
-    def save_to_csv(self, filename="tracker_performance_data.csv"):
-        df = pd.DataFrame(self.all_frame_data)
-        df.to_csv(filename, index=False)
-        print(f"Performance data saved to {filename}")
+        # Pass the IoU from update_accuracy to avoid computing it twice
+        if iou is None:
+            iou = (
+                self.calculate_iou(ground_truth_bbox, predicted_bbox)
+                if ground_truth_bbox and predicted_bbox
+                else 0.0
+            )
+        gt = ground_truth_bbox if ground_truth_bbox else (-1, -1, -1, -1)
+        pred = predicted_bbox if predicted_bbox else (-1, -1, -1, -1)
+        if self._writer is None:
+            self._file = open(self.filename, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(CSV_HEADER)
+        self._writer.writerow((frame_num, algorithm, fps, *gt, *pred, iou, success))
+
+    def save_to_csv(self, filename=None):
+        """Close the streamed CSV, moving it to `filename` if one is given"""
+        if self._file is None:
+            print("No performance data recorded")
+            return
+        self._file.close()
+        self._file = None
+        self._writer = None
+        if filename and filename != self.filename:
+            os.replace(self.filename, filename)
+            self.filename = filename
+        print(f"Performance data saved to {self.filename}")
 
     def get_report(self):
         report = "=== Tracking Algorithm Performance Report ===\n"
@@ -177,13 +280,34 @@ class TrackerBenchmark:
         self.analytics = TrackerAnalytics()
         self.algorithms = ["CSRT", "KCF", "MIL", "MOSSE"]
         self.current_algorithm_idx = 0
+        self.current_algorithm = self.algorithms[0]
         self.current_tracker = None
         self.target_bbox = None  # Predicted bbox from the tracker
         self.ground_truth_bbox = None  # Bbox from Haar Cascade
+        self.detect_interval = 15  # Re-detect every N frames while locked
+        self.frames_since_detect = 0
+        self.last_success = False
+
+        # Run the detection pipeline on OpenCL (T-API) when it is available
+        self.use_opencl = cv2.ocl.useOpenCL()
+
+        # Scratch buffer reused across detections (detector thread only)
+        self._gray = None
+
         self.frame_count = 0
-        self.last_time = time.time()
+        self.last_time_ns = time.monotonic_ns()
         self.fps = 0
 
+        # Pipeline: reader thread -> read_q -> main loop -> record_q -> writer thread
+        self.read_q = queue.Queue(maxsize=4)
+        self.record_q = queue.Queue(maxsize=4)
+        self.running = False
+
+        # Haar detection runs on its own thread; results are keyed by frame id
+        self.detect_q = queue.Queue(maxsize=1)
+        self.detections = {}
+        self._detections_lock = threading.Lock()
+
         # Haar Cascade Face Detector
         self.face_detector = cv2.CascadeClassifier(haar_cascade_path)
         if self.face_detector.empty():
@@ -191,28 +315,83 @@ class TrackerBenchmark:
                 f"Could not load Haar Cascade classifier from {haar_cascade_path}"
             )
 
-    def detect_face(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_detector.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+        # Detection parameters (applied to the half-resolution frame)
+        self.scale_factor = 1.2
+        self.min_neighbors = 5
+        self.min_size = (15, 15)
+        self.max_size = (0, 0)  # No upper limit
+
+        # Warm up so lazy allocations don't stall the first real frame
+        self._detect(np.zeros((120, 120), np.uint8))
+
+    def _detect(self, gray):
+        return self.face_detector.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size,
+            maxSize=self.max_size,
         )
 
+    def detect_face(self, small):
+        # `small` is a half-resolution frame (4x fewer pixels), scale back up
+        if self.use_opencl:
+            gray = cv2.cvtColor(cv2.UMat(small), cv2.COLOR_BGR2GRAY)
+        else:
+            self._gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            gray = self._gray
+        faces = self._detect(gray)
+
         if len(faces) > 0:
             # Return the largest face found
             largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
-            return tuple(largest_face)
+            return tuple(int(v) * 2 for v in largest_face)
         return None
 
-    def start_tracking(self):
+    def _detect_faces(self):
+        while True:
+            item = self.detect_q.get()
+            if item is None:
+                break
+            frame_id, small = item
+            bbox = self.detect_face(small)
+            with self._detections_lock:
+                self.detections[frame_id] = bbox
+
+    def submit_detection(self, frame):
+        """Queue a frame for detection, dropping it if the detector is busy"""
+        if self.detect_q.full():
+            return False
+        # The detector gets its own downscaled copy, since overlays are drawn
+        # on `frame` while detection is still running
+        size = (frame.shape[1] // 2, frame.shape[0] // 2)
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        try:
+            self.detect_q.put_nowait((self.frame_count, small))
+        except queue.Full:
+            return False
+        return True
+
+    def poll_detection(self):
+        """Return the newest finished (frame_id, bbox) detection, or None"""
+        with self._detections_lock:
+            if not self.detections:
+                return None
+            frame_id = max(self.detections)
+            bbox = self.detections[frame_id]
+            self.detections.clear()
+        return frame_id, bbox
+
+    def start_tracking(self, frame):
         if self.current_tracker:
-            self.analytics.end_tracking(self.algorithms[self.current_algorithm_idx])
+            self.analytics.end_tracking(self.current_algorithm)
 
-        algorithm = self.algorithms[self.current_algorithm_idx]
+        algorithm = self.current_algorithm
         self.current_tracker = self.tracker_factory.create_tracker(algorithm)
-        frame = self.camera.get_frame()
         if frame is not None and self.ground_truth_bbox is not None:
             try:
                 self.current_tracker.init(frame, self.ground_truth_bbox)
+                self.target_bbox = self.ground_truth_bbox
                 self.analytics.start_tracking(algorithm)
                 print(f"Started tracking with {algorithm}")
             except Exception as e:
@@ -223,7 +402,7 @@ class TrackerBenchmark:
 
     def stop_tracking(self):
         if self.current_tracker:
-            self.analytics.end_tracking(self.algorithms[self.current_algorithm_idx])
+            self.analytics.end_tracking(self.current_algorithm)
             self.current_tracker = None
             self.target_bbox = None
             self.ground_truth_bbox = None
@@ -234,15 +413,38 @@ class TrackerBenchmark:
         self.current_algorithm_idx = (self.current_algorithm_idx + 1) % len(
             self.algorithms
         )
-        print(f"Switched to algorithm: {self.algorithms[self.current_algorithm_idx]}")
+        self.current_algorithm = self.algorithms[self.current_algorithm_idx]
+        print(f"Switched to algorithm: {self.current_algorithm}")
 
     def calculate_fps(self):
+        # Exponential moving average, refreshed every frame for the CSV rows
         self.frame_count += 1
-        if self.frame_count % 30 == 0:
-            current_time = time.time()
-            self.fps = 30 / (current_time - self.last_time)
-            self.last_time = current_time
-            self.analytics.update_fps(self.fps)
+        now = time.monotonic_ns()
+        dt = now - self.last_time_ns
+        self.last_time_ns = now
+        inst_fps = 1e9 / dt if dt else 0
+        self.fps = 0.9 * self.fps + 0.1 * inst_fps if self.fps else inst_fps
+        self.analytics.update_fps(self.fps)
+
+    def _read_frames(self):
+        while self.running:
+            frame = self.camera.get_frame()
+            # Block while the main loop is behind, but keep checking for shutdown
+            while self.running:
+                try:
+                    self.read_q.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if frame is None:
+                break
+
+    def _write_records(self):
+        while True:
+            record = self.record_q.get()
+            if record is None:
+                break
+            self.analytics.record_frame_data(*record)
 
     def run(self):
         cv2.namedWindow("Tracker Benchmark", cv2.WINDOW_NORMAL)
@@ -255,63 +457,99 @@ class TrackerBenchmark:
         print("  - Press 'Q' to quit and see the report.")
         print("----------------------------------------------------------")
 
-        while True:
-            frame = self.camera.get_frame()
-            if frame is None:
-                print("End of video or camera disconnected.")
-                break
-
-            self.calculate_fps()
-
-            display_frame = frame.copy()
-
-            # Detect face for ground truth
-            self.ground_truth_bbox = self.detect_face(frame)
-
-            if self.ground_truth_bbox:
-                # Draw ground truth bbox
-                x, y, w, h = [int(v) for v in self.ground_truth_bbox]
-                cv2.rectangle(
-                    display_frame, (x, y), (x + w, y + h), (0, 255, 255), 2
-                )  # Yellow for ground truth
-                cv2.putText(
-                    display_frame,
-                    "GT",
-                    (x, y - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (0, 255, 255),
-                    2,
+        self.running = True
+        reader = threading.Thread(target=self._read_frames, daemon=True)
+        writer = threading.Thread(target=self._write_records, daemon=True)
+        detector = threading.Thread(target=self._detect_faces, daemon=True)
+        reader.start()
+        writer.start()
+        detector.start()
+
+        try:
+            while True:
+                frame = self.read_q.get()
+                if frame is None:
+                    print("End of video or camera disconnected.")
+                    break
+
+                self.calculate_fps()
+
+                # Request a detection only when unlocked, lost, or due
+                need_detect = (
+                    self.current_tracker is None
+                    or not self.last_success
+                    or self.frames_since_detect >= self.detect_interval
                 )
+                if need_detect and self.submit_detection(frame):
+                    self.frames_since_detect = 0
+                else:
+                    self.frames_since_detect += 1
+
+                # Ground truth is fresh only on frames where a detection finished
+                detection = self.poll_detection()
+                gt_fresh = detection is not None
+                if gt_fresh:
+                    self.ground_truth_bbox = detection[1]
 
                 # If no tracker is active, or tracking was lost, start new tracking with detected face
-                if not self.current_tracker or not self.target_bbox:
-                    self.start_tracking()
+                gt_bbox = self.ground_truth_bbox
+                if (
+                    gt_fresh
+                    and gt_bbox
+                    and (not self.current_tracker or not self.target_bbox)
+                ):
+                    self.start_tracking(frame)
+
+                # Run the tracker before anything is drawn, overlays go on `frame` itself
+                success = False
+                lost = False
+                iou = None
+                if self.current_tracker and self.target_bbox:
+                    success, bbox = self.current_tracker.update(frame)
+                    if success:
+                        self.target_bbox = bbox
+                        if self.ground_truth_bbox and gt_fresh:
+                            iou = self.analytics.update_accuracy(
+                                self.ground_truth_bbox, bbox
+                            )
+                    else:
+                        lost = True
+                        self.stop_tracking()
+                self.last_success = success
+
+                if gt_bbox:
+                    # Draw ground truth bbox
+                    x, y, w, h = [int(v) for v in gt_bbox]
+                    cv2.rectangle(
+                        frame, (x, y), (x + w, y + h), (0, 255, 255), 2
+                    )  # Yellow for ground truth
+                    cv2.putText(
+                        frame,
+                        "GT",
+                        (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.7,
+                        (0, 255, 255),
+                        2,
+                    )
 
-            success = False
-            if self.current_tracker and self.target_bbox:
-                success, bbox = self.current_tracker.update(frame)
                 if success:
-                    self.target_bbox = bbox
-                    if self.ground_truth_bbox:
-                        self.analytics.update_accuracy(self.ground_truth_bbox, bbox)
                     p1 = (int(bbox[0]), int(bbox[1]))
                     p2 = (int(bbox[0] + bbox[2]), int(bbox[1] + bbox[3]))
-                    cv2.rectangle(
-                        display_frame, p1, p2, (255, 0, 0), 2
-                    )  # Blue for tracked bbox
+                    # Blue for tracked bbox
+                    cv2.rectangle(frame, p1, p2, (255, 0, 0), 2)
                     cv2.putText(
-                        display_frame,
-                        self.algorithms[self.current_algorithm_idx],
+                        frame,
+                        self.current_algorithm,
                         (p1[0], p1[1] - 10),
                         cv2.FONT_HERSHEY_SIMPLEX,
                         0.7,
                         (255, 0, 0),
                         2,
                     )
-                else:
+                elif lost:
                     cv2.putText(
-                        display_frame,
+                        frame,
                         "Tracking Lost!",
                         (50, 80),
                         cv2.FONT_HERSHEY_SIMPLEX,
@@ -319,41 +557,62 @@ class TrackerBenchmark:
                         (0, 0, 255),
                         3,
                     )
-                    self.stop_tracking()
-
-            # Record data for the current frame
-            self.analytics.record_frame_data(
-                self.frame_count,
-                self.algorithms[self.current_algorithm_idx],
-                self.fps,
-                self.ground_truth_bbox,
-                self.target_bbox,
-                success,
-            )
 
-            cv2.putText(
-                display_frame,
-                f"FPS: {self.fps:.2f}",
-                (50, 50),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (0, 255, 0),
-                2,
-            )
-            cv2.imshow("Tracker Benchmark", display_frame)
+                # Stale ground truth is not measured: log it as missing with NaN IoU
+                if not gt_fresh:
+                    iou = float("nan")
+
+                # Record data for the current frame on the writer thread
+                self.record_q.put(
+                    (
+                        self.frame_count,
+                        self.current_algorithm,
+                        self.fps,
+                        self.ground_truth_bbox if gt_fresh else None,
+                        self.target_bbox,
+                        success,
+                        iou,
+                    )
+                )
 
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord("q"):
-                break
-            elif key == ord("t"):
-                self.switch_algorithm()
-            elif key == ord("r"):
-                self.stop_tracking()
-
-        self.stop_tracking()  # Ensure tracking is ended before report
-        self.camera.release()
-        cv2.destroyAllWindows()
-        self.analytics.save_to_csv()
+                cv2.putText(
+                    frame,
+                    f"FPS: {self.fps:.2f}",
+                    (50, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    1,
+                    (0, 255, 0),
+                    2,
+                )
+                cv2.imshow("Tracker Benchmark", frame)
+
+                # Non-blocking on OpenCV 4.5+, waitKey(1) sleeps at least 1 ms
+                key = (
+                    cv2.pollKey() if hasattr(cv2, "pollKey") else cv2.waitKey(1)
+                ) & 0xFF
+                if key == ord("q"):
+                    break
+                elif key == ord("t"):
+                    self.switch_algorithm()
+                elif key == ord("r"):
+                    self.stop_tracking()
+        finally:
+            # Shut down and close the CSV even if the loop raised
+            self.running = False
+            reader.join()
+            self.record_q.put(None)
+            writer.join()
+            try:
+                self.detect_q.get_nowait()  # Make room for the sentinel
+            except queue.Empty:
+                pass
+            self.detect_q.put(None)
+            detector.join()
+
+            self.stop_tracking()  # Ensure tracking is ended before report
+            self.camera.release()
+            cv2.destroyAllWindows()
+            self.analytics.save_to_csv()
         print(self.analytics.get_report())
 
 
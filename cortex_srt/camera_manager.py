@@ -1,9 +1,15 @@
 # camera_manager.py (updated for vertical camera)
 import cv2
 import threading
-import queue
 import numpy as np
-import imutils
+
+
+# cv2.rotate codes for the supported rotation angles
+ROTATE_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    -90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    180: cv2.ROTATE_180,
+}
 
 
 class CameraManager:
@@ -21,6 +27,13 @@ class CameraManager:
 
         self.rotate_angle = rotate_angle  # 90 for clockwise, -90 for counter-clockwise
 
+        # Keep only the newest frame in the driver and let the camera send
+        # MJPG, which is cheaper to move and decode than raw YUYV at 720p
+        if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+            print("[WARN] Camera ignored CAP_PROP_BUFFERSIZE, relying on grab()")
+        if not self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG")):
+            print("[WARN] Camera does not accept MJPG, using its default format")
+
         # Set to proper 1080p resolution (will be rotated)
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
@@ -29,9 +42,32 @@ class CameraManager:
         if not self.cap.isOpened():
             raise RuntimeError(f"Could not open camera with index {camera_index}")
 
-        # Use threading for better performance
-        self.frame_queue = queue.Queue(maxsize=2)
+        # Use threading for better performance. The capture thread publishes
+        # only the newest frame, older ones are dropped instead of queued.
         self.current_frame = None
+        self._lock = threading.Lock()
+        self._new_frame = threading.Event()
+
+        # Incremented per captured frame, so get_frame never returns a frame
+        # twice even if the event fires for a frame already handed out
+        self.frame_id = 0
+        self._last_returned_id = 0
+
+        # Triple buffer of preallocated rotation outputs: one slot is held by
+        # the consumer, one is current_frame and the third is being written,
+        # so a slot is never overwritten while still in use.
+        self._rotated = [None] * 3
+        self._held_idx = None
+        self._current_idx = None
+
+        # Resize/rotate plan, computed once per input frame size
+        self._input_size = None
+        self._out_size = None
+        self._resize = False
+        self._scaled_size = None
+        self._scaled = None  # INTER_AREA output before rotation (downscaling)
+        self._M = None
+
         self.capture_thread = threading.Thread(target=self._capture_frames)
         self.capture_thread.daemon = True
         self.running = True
@@ -39,30 +75,111 @@ class CameraManager:
 
     def _capture_frames(self):
         while self.running:
-            ret, frame = self.cap.read()
-            frame = imutils.resize(
-                frame, width=self.frame_width, height=self.frame_height
-            )
-            if ret:
-                # Rotate the frame
-                if self.rotate_angle == 90:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-                elif self.rotate_angle == -90:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-                elif self.rotate_angle == 180:
-                    frame = cv2.rotate(frame, cv2.ROTATE_180)
-
-                if not self.frame_queue.full():
-                    self.frame_queue.put(frame)
+            # Grab every frame to keep the driver buffer drained (needed when
+            # CAP_PROP_BUFFERSIZE is ignored), but only decode (retrieve) once
+            # the consumer has taken the previous frame
+            if not self.cap.grab():
+                break
+            if self._new_frame.is_set():
+                continue
+
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                continue
+
+            with self._lock:
+                idx = next(
+                    i for i in range(3) if i not in (self._held_idx, self._current_idx)
+                )
+            frame, used = self._transform(frame, idx)
+            with self._lock:
                 self.current_frame = frame
+                self._current_idx = idx if used else None
+                self.frame_id += 1
+            self._new_frame.set()
+
+    def _plan_transform(self, w, h):
+        # Scale to frame_width keeping the aspect ratio (as imutils.resize did)
+        scale = self.frame_width / float(w)
+        sw, sh = self.frame_width, int(h * scale)
+        self._input_size = (w, h)
+        self._resize = (sw, sh) != (w, h)
+        self._scaled_size = (sw, sh)
+        self._M = None
+
+        angle = self.rotate_angle
+        self._out_size = (sh, sw) if angle in (90, -90) else (sw, sh)
+        # Downscaling keeps INTER_AREA (warpAffine's bilinear would alias),
+        # so only upscaling is fused with the rotation
+        if not self._resize or angle not in ROTATE_CODES or scale < 1:
+            return
+
+        # Fused scale + rotation, mapping source pixel centers to output centers
+        s = scale
+        o = 0.5 * s - 0.5
+        if angle == 90:
+            self._M = np.float32([[0, -s, s * h - 1 - o], [s, 0, o]])
+        elif angle == -90:
+            self._M = np.float32([[0, s, o], [-s, 0, s * w - 1 - o]])
+        else:
+            self._M = np.float32([[-s, 0, s * w - 1 - o], [0, -s, s * h - 1 - o]])
+
+    def _transform(self, frame, idx):
+        """Resize/rotate into ring slot `idx`, returns (frame, slot_used)"""
+        h, w = frame.shape[:2]
+        if self._input_size != (w, h):
+            self._plan_transform(w, h)
+
+        rotate_code = ROTATE_CODES.get(self.rotate_angle)
+        if not self._resize and rotate_code is None:
+            return frame, False
+
+        # cv2 reuses dst when its shape matches, otherwise it allocates a new one
+        dst = self._rotated[idx]
+        if self._M is not None:
+            # Resize and rotate in a single pass over the frame
+            dst = cv2.warpAffine(
+                frame, self._M, self._out_size, dst=dst, flags=cv2.INTER_LINEAR
+            )
+        elif self._resize and rotate_code is None:
+            dst = cv2.resize(
+                frame, self._out_size, dst=dst, interpolation=cv2.INTER_AREA
+            )
+        elif self._resize:
+            # Downscale with INTER_AREA, then transpose/flip into the slot
+            self._scaled = cv2.resize(
+                frame,
+                self._scaled_size,
+                dst=self._scaled,
+                interpolation=cv2.INTER_AREA,
+            )
+            dst = cv2.rotate(self._scaled, rotate_code, dst=dst)
+        else:
+            # Already at the target size, a plain transpose/flip is cheapest
+            dst = cv2.rotate(frame, rotate_code, dst=dst)
+
+        self._rotated[idx] = dst
+        return dst, True
 
-    def get_frame(self):
-        if not self.frame_queue.empty():
-            return self.frame_queue.get()
-        return self.current_frame
+    def get_frame(self, timeout=0.1):
+        """Return the newest frame, or None if no new frame arrived in time"""
+        if not self._new_frame.wait(timeout):
+            return None
+        with self._lock:
+            self._new_frame.clear()
+            if self.frame_id == self._last_returned_id:
+                return None  # Already handed out, nothing newer yet
+            self._last_returned_id = self.frame_id
+            # The capture thread will not write into this slot until the next call
+            self._held_idx = self._current_idx
+            return self.current_frame
 
     def get_current_frame(self):
-        return self.current_frame
+        # Copy, the caller may hold it while the capture thread moves on
+        with self._lock:
+            if self.current_frame is None:
+                return None
+            return self.current_frame.copy()
 
     def release(self):
         self.running = False
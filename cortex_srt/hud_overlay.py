@@ -1,8 +1,26 @@
 # hud_overlay.py (updated for vertical display)
 import cv2
 import numpy as np
-from datetime import datetime
+import math
 import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from _jit import HAS_NUMBA, njit, prange
+
+
+# Only used when numba is available, add_scan_lines falls back to cv2
+@njit(parallel=True, cache=True, fastmath=True)
+def _darken_rows(frame, step, scale):
+    # Float32 multiply and round-half-to-even, as convertScaleAbs (cvRound)
+    # does, so both paths give the same pixels
+    s = np.float32(scale)
+    # Rows are independent, so they are split across threads
+    for y in prange((frame.shape[0] + step - 1) // step):
+        row = frame[y * step]
+        for x in range(row.shape[0]):
+            for c in range(row.shape[1]):
+                row[x, c] = np.uint8(np.rint(np.float32(row[x, c]) * s))
 
 
 class HUDOverlay:
@@ -23,36 +41,110 @@ class HUDOverlay:
         # Fire zone parameters
         self.fire_zone_radius = 30  # pixels from center
 
+        # Static layer (grid, compass, ranging marks) and its mask, per frame size
+        self._static_cache = {}
+
+        # Pre-rendered (bitmap, mask) for static or few-valued labels
+        self._label_cache = {}
+
+        # Info panel column x-offsets per panel width, and the FPS string
+        self._panel_columns = {}
+        self._last_fps = None
+        self._fps_str = ""
+
+        # Per-draw timestamp and the clock string, re-formatted once per second
+        self._now = time.time()
+        self._last_sec = -1
+        self._last_time_str = ""
+
+        # Simulated target ID strings per bbox (bounded) and distance (5 Hz)
+        self._id_str_cache = {}
+        self._dist_str = ""
+        self._dist_next_t = 0
+
+        # Single worker for draw_async, cv2 releases the GIL while drawing
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+        # Compile _darken_rows now rather than on the first displayed frame
+        if HAS_NUMBA:
+            _darken_rows(np.zeros((8, 8, 3), np.uint8), 4, 0.85)
+
     def draw(
-        self, frame, target_bbox, fps, algorithm, tracking_active, in_fire_zone=False
+        self,
+        frame,
+        target_bbox,
+        fps,
+        algorithm,
+        tracking_active,
+        in_fire_zone=False,
+        reset_acquisition=False,
     ):
-        overlay = frame.copy()
+        # Everything is drawn directly onto `frame` (the caller passes a copy)
         height, width = frame.shape[:2]
+        self._now = time.time()
 
-        # Draw crosshair with fire zone indicator
-        self.draw_crosshair(overlay, width, height, in_fire_zone)
+        # New target selected, restart the acquisition animation. Applied
+        # here so it runs on the same thread as draw_target.
+        if reset_acquisition:
+            self.acquisition_start_time = None
 
-        # Draw compass/heading indicator (adjusted for vertical)
-        self.draw_compass(overlay, width, height)
+        # Draw crosshair with fire zone indicator
+        self.draw_crosshair(frame, width, height, in_fire_zone)
 
         # Draw info panels on sides for vertical display
-        self.draw_info_panel(overlay, fps, algorithm, tracking_active, in_fire_zone)
+        self.draw_info_panel(frame, fps, algorithm, tracking_active, in_fire_zone)
 
-        # Draw grid overlay
-        self.draw_grid(overlay, width, height)
+        # Grid, compass and ranging marks never change, blit the cached layer
+        layer, mask, idx, colors = self.get_static_layer(width, height)
+        if frame.flags.c_contiguous and frame.ndim == 3:
+            # Scatter only the drawn pixels instead of a full-frame masked copy
+            frame.reshape(-1, 3)[idx] = colors
+        else:
+            np.copyto(frame, layer, where=mask)
 
         # Draw target if tracking
         if target_bbox and tracking_active:
-            self.draw_target(overlay, target_bbox, in_fire_zone)
+            self.draw_target(frame, target_bbox, in_fire_zone)
         elif target_bbox and not tracking_active:
             # Draw lost target indicator
-            self.draw_lost_target(overlay, target_bbox)
+            self.draw_lost_target(frame, target_bbox)
 
         # Add scan lines effect
-        overlay = self.add_scan_lines(overlay)
+        return self.add_scan_lines(frame)
+
+    def draw_async(
+        self,
+        frame,
+        target_bbox,
+        fps,
+        algorithm,
+        tracking_active,
+        in_fire_zone=False,
+        reset_acquisition=False,
+    ):
+        """Queue a HUD draw on `frame` and return the previously finished frame"""
+        # The caller must not touch `frame` or any HUD attribute until the
+        # next call, they belong to the worker; pass resets as arguments
+        previous = self._pending.result() if self._pending is not None else None
+        if target_bbox is not None:
+            target_bbox = tuple(target_bbox)
+        self._pending = self._executor.submit(
+            self.draw,
+            frame,
+            target_bbox,
+            fps,
+            algorithm,
+            tracking_active,
+            in_fire_zone,
+            reset_acquisition,
+        )
+        return previous
 
-        # Blend with original
-        return cv2.addWeighted(frame, 1, overlay, 0.8, 0)
+    def close(self):
+        """Wait for any in-flight draw and stop the worker"""
+        self._executor.shutdown(wait=True)
+        self._pending = None
 
     def draw_crosshair(self, frame, width, height, in_fire_zone):
         center_x, center_y = width // 2, height // 2
@@ -64,7 +156,7 @@ class HUDOverlay:
         if in_fire_zone:
             # Pulsing effect
             pulse_radius = self.fire_zone_radius + int(
-                5 * np.sin(self.fire_zone_animation)
+                5 * math.sin(self.fire_zone_animation)
             )
             cv2.circle(
                 frame, (center_x, center_y), pulse_radius, self.color_fire_zone, 2
@@ -112,39 +204,61 @@ class HUDOverlay:
         crosshair_color = self.color_fire_zone if in_fire_zone else self.color_primary
         line_thickness = 3 if in_fire_zone else 2
 
-        cv2.line(
-            frame,
-            (center_x - 40, center_y),
-            (center_x - 20, center_y),
-            crosshair_color,
-            line_thickness,
-        )
-        cv2.line(
-            frame,
-            (center_x + 20, center_y),
-            (center_x + 40, center_y),
-            crosshair_color,
-            line_thickness,
-        )
-        cv2.line(
-            frame,
-            (center_x, center_y - 40),
-            (center_x, center_y - 20),
-            crosshair_color,
-            line_thickness,
-        )
-        cv2.line(
-            frame,
-            (center_x, center_y + 20),
-            (center_x, center_y + 40),
-            crosshair_color,
-            line_thickness,
+        segments = np.array(
+            [
+                [[center_x - 40, center_y], [center_x - 20, center_y]],
+                [[center_x + 20, center_y], [center_x + 40, center_y]],
+                [[center_x, center_y - 40], [center_x, center_y - 20]],
+                [[center_x, center_y + 20], [center_x, center_y + 40]],
+            ],
+            dtype=np.int32,
         )
+        cv2.polylines(frame, segments, False, crosshair_color, line_thickness)
 
         # Center dot - pulsing when in fire zone
         dot_size = 5 if in_fire_zone else 3
         cv2.circle(frame, (center_x, center_y), dot_size, crosshair_color, -1)
 
+    def get_static_layer(self, width, height):
+        """Render the static HUD elements once per frame size"""
+        key = (width, height)
+        if key not in self._static_cache:
+            layer = np.zeros((height, width, 3), np.uint8)
+            self.draw_grid(layer, width, height)
+            self.draw_compass(layer, width, height)
+            self.draw_ranging_marks(layer, width, height)
+            mask = layer.any(axis=2, keepdims=True)
+            # Flat pixel indices and colours of the few non-black pixels
+            idx = np.flatnonzero(mask)
+            colors = layer.reshape(-1, 3)[idx]
+            self._static_cache[key] = (layer, mask, idx, colors)
+        return self._static_cache[key]
+
+    def _render_text(self, text, scale, color):
+        """Rasterize a label once and return its (bitmap, mask, ascent)"""
+        key = (text, scale, color)
+        if key not in self._label_cache:
+            (w, h), baseline = cv2.getTextSize(text, self.font, scale, 1)
+            img = np.zeros((h + baseline + 1, w + 1, 3), np.uint8)
+            cv2.putText(img, text, (0, h), self.font, scale, color, 1)
+            mask = img.any(axis=2, keepdims=True)
+            self._label_cache[key] = (img, mask, h)
+        return self._label_cache[key]
+
+    def put_label(self, frame, text, org, scale, color):
+        """Drop-in for cv2.putText that composites a cached bitmap"""
+        img, mask, ascent = self._render_text(text, scale, color)
+        x, y = org[0], org[1] - ascent
+        h, w = img.shape[:2]
+        if x < 0 or y < 0 or x + w > frame.shape[1] or y + h > frame.shape[0]:
+            # Partly off-screen, leave the clipping to OpenCV
+            cv2.putText(frame, text, org, self.font, scale, color, 1)
+            return
+        np.copyto(frame[y : y + h, x : x + w], img, where=mask)
+
+    def draw_ranging_marks(self, frame, width, height):
+        center_x, center_y = width // 2, height // 2
+
         # Ranging marks - adjusted for vertical display
         for i in range(1, 3):
             cv2.circle(frame, (center_x, center_y), i * 50, self.color_secondary, 1)
@@ -155,24 +269,16 @@ class HUDOverlay:
         compass_height = 300
         start_y = (height - compass_height) // 2
 
-        cv2.line(
-            frame,
-            (compass_x, start_y),
-            (compass_x, start_y + compass_height),
-            self.color_primary,
-            1,
-        )
-
-        # Tick marks
+        # Spine and tick marks in a single polylines call
+        segments = [[[compass_x, start_y], [compass_x, start_y + compass_height]]]
         for i in range(0, compass_height + 1, 30):
             tick_width = 10 if i % 60 == 0 else 5
-            cv2.line(
-                frame,
-                (compass_x, start_y + i),
-                (compass_x + tick_width, start_y + i),
-                self.color_primary,
-                1,
+            segments.append(
+                [[compass_x, start_y + i], [compass_x + tick_width, start_y + i]]
             )
+        cv2.polylines(
+            frame, np.array(segments, dtype=np.int32), False, self.color_primary, 1
+        )
 
         # Direction indicators
         cv2.putText(
@@ -202,16 +308,9 @@ class HUDOverlay:
         panel_height = 120
         panel_width = width - 40
 
-        # Semi-transparent background
-        overlay = frame.copy()
-        cv2.rectangle(
-            overlay,
-            (20, panel_y),
-            (20 + panel_width, panel_y + panel_height),
-            (0, 0, 0),
-            -1,
-        )
-        frame[:] = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
+        # Semi-transparent black background, i.e. darken the panel ROI to 30%
+        roi = frame[panel_y : panel_y + panel_height, 20 : 20 + panel_width]
+        cv2.convertScaleAbs(roi, dst=roi, alpha=0.3, beta=0)
 
         # Border
         cv2.rectangle(
@@ -222,48 +321,44 @@ class HUDOverlay:
             1,
         )
 
-        # Info arranged horizontally for vertical display
-        info_items = [
-            ("FPS", f"{fps:.1f}"),
-            ("ALG", algorithm),
-            ("STATUS", "TRACKING" if tracking_active else "STANDBY"),
-            ("FIRE", "READY" if in_fire_zone and tracking_active else "HOLD"),
-        ]
-
-        x_offset = 30
-        for label, value in info_items:
-            # Label
-            cv2.putText(
-                frame,
-                label,
-                (x_offset, panel_y + 30),
-                self.font,
-                0.4,
-                self.color_secondary,
-                1,
-            )
-            # Value
-            color = self.color_primary
-            if label == "STATUS" and tracking_active:
-                color = self.color_alert
-            elif label == "FIRE" and in_fire_zone and tracking_active:
-                color = self.color_fire_zone
-
-            cv2.putText(
-                frame,
-                value,
-                (x_offset, panel_y + 55),
-                self.font,
-                0.5,
-                color,
-                1,
-            )
-            x_offset += (panel_width - 40) // 4
+        # Info arranged horizontally for vertical display, the four column
+        # x-offsets only depend on the panel width
+        xs = self._panel_columns.get(panel_width)
+        if xs is None:
+            step = (panel_width - 40) // 4
+            xs = self._panel_columns[panel_width] = [30 + i * step for i in range(4)]
+        label_y = panel_y + 30
+        value_y = panel_y + 55
+
+        for x_offset, label in zip(xs, ("FPS", "ALG", "STATUS", "FIRE")):
+            self.put_label(frame, label, (x_offset, label_y), 0.4, self.color_secondary)
+
+        # FPS only changes when the caller recomputes it (every 30 frames), so
+        # the string is re-formatted then; too many values to cache bitmaps
+        if fps != self._last_fps:
+            self._last_fps = fps
+            self._fps_str = f"{fps:.1f}"
+        cv2.putText(
+            frame, self._fps_str, (xs[0], value_y), self.font, 0.5, self.color_primary, 1
+        )
+        self.put_label(frame, algorithm, (xs[1], value_y), 0.5, self.color_primary)
+        if tracking_active:
+            self.put_label(frame, "TRACKING", (xs[2], value_y), 0.5, self.color_alert)
+        else:
+            self.put_label(frame, "STANDBY", (xs[2], value_y), 0.5, self.color_primary)
+        if in_fire_zone and tracking_active:
+            self.put_label(frame, "READY", (xs[3], value_y), 0.5, self.color_fire_zone)
+        else:
+            self.put_label(frame, "HOLD", (xs[3], value_y), 0.5, self.color_primary)
 
         # Time at bottom
+        sec = int(self._now)
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_time_str = time.strftime("%H:%M:%S", time.localtime(sec))
         cv2.putText(
             frame,
-            datetime.now().strftime("%H:%M:%S"),
+            self._last_time_str,
             (width // 2 - 40, panel_y + 90),
             self.font,
             0.6,
@@ -273,28 +368,44 @@ class HUDOverlay:
 
     def draw_grid(self, frame, width, height):
         # Lighter grid for vertical display
+        # Axis-aligned 1px lines cannot alias, so LINE_8 is enough
         # Horizontal lines
-        for y in range(0, height, height // 8):
-            cv2.line(frame, (0, y), (width, y), self.color_secondary, 1, cv2.LINE_AA)
+        ys = np.arange(0, height, height // 8)
+        hlines = np.stack(
+            [np.zeros_like(ys), ys, np.full_like(ys, width), ys], axis=1
+        ).reshape(-1, 2, 2)
 
         # Vertical lines
-        for x in range(0, width, width // 6):
-            cv2.line(frame, (x, 0), (x, height), self.color_secondary, 1, cv2.LINE_AA)
+        xs = np.arange(0, width, width // 6)
+        vlines = np.stack(
+            [xs, np.zeros_like(xs), xs, np.full_like(xs, height)], axis=1
+        ).reshape(-1, 2, 2)
+
+        cv2.polylines(
+            frame,
+            np.concatenate([hlines, vlines]).astype(np.int32),
+            False,
+            self.color_secondary,
+            1,
+            cv2.LINE_8,
+        )
 
     def draw_target(self, frame, bbox, in_fire_zone):
         x, y, w, h = [int(v) for v in bbox]
+        height, width = frame.shape[:2]
 
         # Animate lock acquisition
-        if self.acquisition_start_time is None:
-            self.acquisition_start_time = time.time()
+        start = self.acquisition_start_time
+        if start is None:
+            start = self.acquisition_start_time = self._now
 
-        acquisition_time = time.time() - self.acquisition_start_time
+        acquisition_time = self._now - start
 
         if acquisition_time < 0.5:  # Acquisition phase
             color = self.color_acquiring
             label = "ACQUIRING..."
             # Pulsing effect
-            pulse = int(abs(np.sin(acquisition_time * 10)) * 255)
+            pulse = int(abs(math.sin(acquisition_time * 10)) * 255)
             color = (pulse, pulse, 0)
         else:  # Locked phase
             if in_fire_zone:
@@ -308,66 +419,34 @@ class HUDOverlay:
         corner_length = 20
         self.lock_animation_frame += 1
 
-        # More aggressive animation when in fire zone
+        # More aggressive animation and thicker brackets when in fire zone
         if in_fire_zone:
-            offset = int(8 * np.sin(self.lock_animation_frame * 0.2))
+            offset = int(8 * math.sin(self.lock_animation_frame * 0.2))
+            line_thickness = 3
         else:
-            offset = int(5 * np.sin(self.lock_animation_frame * 0.1))
+            offset = int(5 * math.sin(self.lock_animation_frame * 0.1))
+            line_thickness = 2
 
         # Draw corner brackets
-        line_thickness = 3 if in_fire_zone else 2
 
-        # Top-left corner
-        cv2.line(frame, (x - offset, y), (x + corner_length, y), color, line_thickness)
-        cv2.line(frame, (x, y - offset), (x, y + corner_length), color, line_thickness)
-
-        # Top-right corner
-        cv2.line(
-            frame,
-            (x + w - corner_length, y),
-            (x + w + offset, y),
-            color,
-            line_thickness,
-        )
-        cv2.line(
-            frame,
-            (x + w, y - offset),
-            (x + w, y + corner_length),
-            color,
-            line_thickness,
-        )
-
-        # Bottom-left corner
-        cv2.line(
-            frame,
-            (x, y + h - corner_length),
-            (x, y + h + offset),
-            color,
-            line_thickness,
-        )
-        cv2.line(
-            frame,
-            (x - offset, y + h),
-            (x + corner_length, y + h),
-            color,
-            line_thickness,
-        )
-
-        # Bottom-right corner
-        cv2.line(
-            frame,
-            (x + w - corner_length, y + h),
-            (x + w + offset, y + h),
-            color,
-            line_thickness,
-        )
-        cv2.line(
-            frame,
-            (x + w, y + h - corner_length),
-            (x + w, y + h + offset),
-            color,
-            line_thickness,
+        segments = np.array(
+            [
+                # Top-left corner
+                [[x - offset, y], [x + corner_length, y]],
+                [[x, y - offset], [x, y + corner_length]],
+                # Top-right corner
+                [[x + w - corner_length, y], [x + w + offset, y]],
+                [[x + w, y - offset], [x + w, y + corner_length]],
+                # Bottom-left corner
+                [[x, y + h - corner_length], [x, y + h + offset]],
+                [[x - offset, y + h], [x + corner_length, y + h]],
+                # Bottom-right corner
+                [[x + w - corner_length, y + h], [x + w + offset, y + h]],
+                [[x + w, y + h - corner_length], [x + w, y + h + offset]],
+            ],
+            dtype=np.int32,
         )
+        cv2.polylines(frame, segments, False, color, line_thickness)
 
         # Center indicator
         center_x = x + w // 2
@@ -375,12 +454,10 @@ class HUDOverlay:
 
         # Draw line from target center to screen center when not in fire zone
         if not in_fire_zone:
-            screen_center_x = frame.shape[1] // 2
-            screen_center_y = frame.shape[0] // 2
             cv2.line(
                 frame,
                 (center_x, center_y),
-                (screen_center_x, screen_center_y),
+                (width // 2, height // 2),
                 self.color_secondary,
                 1,
                 cv2.LINE_AA,
@@ -391,10 +468,12 @@ class HUDOverlay:
         cv2.putText(frame, label, (x, y - 10), self.font, 0.5, color, 1)
 
         # Distance indicator (simulated)
-        distance = np.random.randint(100, 500)
+        if self._now > self._dist_next_t:
+            self._dist_str = f"D:{random.randint(100, 499)}m"
+            self._dist_next_t = self._now + 0.2
         cv2.putText(
             frame,
-            f"D:{distance}m",
+            self._dist_str,
             (x + w + 5, y + h // 2),
             self.font,
             0.4,
@@ -402,10 +481,17 @@ class HUDOverlay:
             1,
         )
 
-        # Target ID
+        # Target ID, only re-derived when the box moves
+        key = (x, y, w, h)
+        id_str = self._id_str_cache.get(key)
+        if id_str is None:
+            if len(self._id_str_cache) >= 64:
+                # Evict the oldest entry, dicts keep insertion order
+                del self._id_str_cache[next(iter(self._id_str_cache))]
+            id_str = self._id_str_cache[key] = f"TGT-{hash(key) % 1000:03d}"
         cv2.putText(
             frame,
-            f"TGT-{hash(str(bbox))%1000:03d}",
+            id_str,
             (x, y + h + 20),
             self.font,
             0.4,
@@ -432,7 +518,7 @@ class HUDOverlay:
         center_y = y + h // 2
 
         # Blinking effect
-        if int(time.time() * 2) % 2:
+        if int(self._now * 2) % 2:
             cv2.putText(
                 frame,
                 "LOST",
@@ -445,10 +531,12 @@ class HUDOverlay:
             cv2.rectangle(frame, (x, y), (x + w, y + h), self.color_warning, 1)
 
     def add_scan_lines(self, frame):
-        height, width = frame.shape[:2]
-
-        # Create scan line effect - horizontal for vertical display
-        for y in range(0, height, 4):
-            frame[y : y + 1, :] = frame[y : y + 1, :] * 0.85
+        # Create scan line effect - horizontal for vertical display.
+        # Every 4th row is darkened in one uint8 pass over a strided view.
+        if HAS_NUMBA and frame.ndim == 3:
+            _darken_rows(frame, 4, 0.85)
+        else:
+            rows = frame[::4]
+            cv2.convertScaleAbs(rows, dst=rows, alpha=0.85, beta=0)
 
         return frame
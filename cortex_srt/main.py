@@ -14,28 +14,56 @@ from tracker_factory import TrackerFactory
 from pid_controller import PIDController
 from arduino_controller import ArduinoController
 
+# Trackers that only use intensity features, they get a grayscale frame.
+# CSRT and KCF (GRAY|CN by default) use color names, so they keep BGR;
+# a 1-channel frame would silently turn the CN features off.
+GRAY_TRACKERS = {"MIL", "MOSSE"}
+
 
 class TrackingSystem:
-    def __init__(self, camera_index=0, camera_rotate=90, arduino_port="COM8"):
+    def __init__(
+        self,
+        camera_index=0,
+        camera_rotate=90,
+        arduino_port="COM8",
+        use_arduino=True,
+        use_opencl=False,
+    ):
         self.camera = CameraManager(
             camera_index=camera_index, rotate_angle=camera_rotate
         )
         self.hud = HUDOverlay()
         self.tracker_factory = TrackerFactory()
         self.pid_controller = PIDController()
-        self.arduino_comm = ArduinoController(port=arduino_port)
+        # Without an Arduino, servo/laser commands go to a no-op bound once
+        # here instead of being checked on every frame
+        if use_arduino:
+            self.arduino_comm = ArduinoController(port=arduino_port)
+            self._send = self.arduino_comm.send_command
+        else:
+            self.arduino_comm = None
+            self._send = lambda pan, tilt, laser: None
 
         self.current_tracker = None
         self.tracking_active = False
         self.target_bbox = None
         self.frame_count = 0
         self.fps = 0
-        self.last_time = time.time()
+        self.last_time = time.monotonic()
 
         # Tracking algorithms
         # self.algorithms = ["CSRT", "KCF", "MIL", "MOSSE", "MedianFlow"]
         self.algorithms = ["CSRT", "KCF", "MIL", "MOSSE"]
-        self.current_algorithm_idx = 0
+        if self.tracker_factory.is_available("VIT"):
+            # Needs OpenCV 4.9+ and the ONNX model, see tracker_factory.py
+            self.algorithms.append("VIT")
+        # MOSSE is by far the cheapest per update at 720p, default to it
+        self.current_algorithm_idx = (
+            self.algorithms.index("MOSSE")
+            if self.tracker_factory.is_available("MOSSE")
+            else 0
+        )
+        self._current_algo_name = self.algorithms[self.current_algorithm_idx]
 
         # Selection state
         self.selecting = False
@@ -48,100 +76,111 @@ class TrackingSystem:
         self.fire_zone_time = 0
         self.min_fire_zone_time = 0.5  # seconds before firing
 
+        # Errors under this (pixels) give PID moves below the 0.1 degree
+        # command resolution, so the PID update is skipped entirely
+        self.pid_deadband = 5
+
         # Debug flag
         self.debug = True
 
+        # Trackers run on a downscaled frame, bboxes are scaled back up for
+        # the HUD and PID (errors stay in full-resolution pixels)
+        self.track_scale = 0.5
+        self._small_buf = None
+        self._gray_buf = None
+
+        # Optionally hand trackers a cv2.UMat so OpenCV can run parts of the
+        # update through OpenCL (T-API). Off by default, the upload per frame
+        # only pays off on GPUs where the tracker maths dominates.
+        self.use_opencl = use_opencl and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        elif use_opencl:
+            print("OpenCL requested but not available, tracking on the CPU")
+
+        # The tracker runs every `track_every` frames, the PID runs every
+        # frame on the error extrapolated from the last two measurements
+        self.track_every = 2
+        self.last_error = None
+        self.last_error_vel = (0.0, 0.0)
+        self.last_track_frame = 0  # frame_count of the last measurement
+
+        # Frame center for calculate_error, cached per frame shape
+        self._center_shape = None
+        self._frame_center = None
+
+        # Tracking runs on its own thread and hands display frames to the
+        # render loop (main thread, owns the GUI) through a 1-slot queue.
+        # Tracker/target state is shared with the GUI callbacks under a lock.
+        self._state_lock = threading.RLock()
+        self.render_queue = queue.Queue(maxsize=1)
+        self.running = False
+        self._track_error = None  # Exception that stopped the tracking thread
+
+        # Set by mouse_callback, handed to the next HUD draw (same thread)
+        self._reset_hud_acquisition = False
+
+        # Display buffers are recycled through a free list once shown
+        self._free_bufs = queue.Queue()
+
     def run(self):
         cv2.namedWindow("Military Tracking System", cv2.WINDOW_NORMAL)
         cv2.resizeWindow("Military Tracking System", 720, 1280)
         cv2.setMouseCallback("Military Tracking System", self.mouse_callback)
 
-        while True:
-            frame = self.camera.get_frame()
-            if frame is None:
-                continue
-
-            # Calculate FPS
-            self.calculate_fps()
-
-            # Process tracking
-            if self.tracking_active and self.current_tracker:
-                success, bbox = self.current_tracker.update(frame)
-                if success:
-                    self.target_bbox = bbox
-                    # Calculate error and send to Arduino
-                    error_x, error_y = self.calculate_error(bbox, frame.shape)
-
-                    # Check if target is in fire zone
-                    distance_from_center = np.sqrt(error_x**2 + error_y**2)
-                    self.in_fire_zone = distance_from_center < self.fire_zone_threshold
-
-                    # Track time in fire zone
-                    if self.in_fire_zone:
-                        if self.fire_zone_time == 0:
-                            self.fire_zone_time = time.time()
-
-                        # Check if we've been in fire zone long enough
-                        time_in_zone = time.time() - self.fire_zone_time
-                        if time_in_zone > self.min_fire_zone_time:
-                            laser = 1  # Fire!
-                        else:
-                            laser = 0
-                    else:
-                        self.fire_zone_time = 0
-                        laser = 0
-
-                    # Send PID commands
-                    pan, tilt = self.pid_controller.update(error_x, error_y)
-
-                    if (
-                        self.debug and self.frame_count % 10 == 0
-                    ):  # Debug every 10 frames
-                        print(
-                            f"Tracking - Error: ({error_x:.1f}, {error_y:.1f}), "
-                            f"PID Out: ({pan:.2f}°, {tilt:.2f}°), "
-                            f"Fire Zone: {self.in_fire_zone}, Laser: {laser}"
-                        )
+        self.running = True
+        track_thread = threading.Thread(target=self._track_loop, daemon=True)
+        track_thread.start()
+
+        # Bound once, the loop body then uses fast local lookups
+        render_get = self.render_queue.get
+        hud_draw = self.hud.draw_async
+        free_put = self._free_bufs.put
+        imshow = cv2.imshow
+        # pollKey (OpenCV 4.5+) pumps GUI events without sleeping, the render
+        # queue wait above already paces the loop
+        poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
+        while self._track_error is None:
+            try:
+                item = render_get(timeout=0.05)
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                display_frame, target_bbox, algorithm, tracking_active, in_fire_zone = (
+                    item
+                )
 
-                    print(
-                        f"Tracking frame {self.frame_count}: {self.algorithms[self.current_algorithm_idx]} - Success: {success} - BBox: {bbox} Error: ({error_x:.1f}, {error_y:.1f})"
+                # Draw selection box if selecting
+                if self.selecting and self.selection_start and self.selection_end:
+                    cv2.rectangle(
+                        display_frame,
+                        self.selection_start,
+                        self.selection_end,
+                        (0, 255, 0),
+                        2,
                     )
-                    self.arduino_comm.send_command(pan, tilt, laser)
-                else:
-                    if self.debug:
-                        print("Tracking failed - target lost")
-                    self.tracking_active = False
-                    self.target_bbox = None
-                    self.in_fire_zone = False
-                    self.fire_zone_time = 0
-                    # Send stop command when tracking fails
-                    self.arduino_comm.send_command(0, 0, 0)
-
-            # Draw selection box if selecting
-            display_frame = frame.copy()
-            if self.selecting and self.selection_start and self.selection_end:
-                cv2.rectangle(
+
+                # Draw HUD with fire zone status on the worker thread, this
+                # shows the frame finished during the previous iteration
+                display_frame = hud_draw(
                     display_frame,
-                    self.selection_start,
-                    self.selection_end,
-                    (0, 255, 0),
-                    2,
+                    target_bbox,
+                    self.fps,
+                    algorithm,
+                    tracking_active,
+                    in_fire_zone,
+                    self._reset_hud_acquisition,
                 )
+                self._reset_hud_acquisition = False
 
-            # Draw HUD with fire zone status
-            display_frame = self.hud.draw(
-                display_frame,
-                self.target_bbox,
-                self.fps,
-                self.algorithms[self.current_algorithm_idx],
-                self.tracking_active,
-                self.in_fire_zone,
-            )
-
-            cv2.imshow("Military Tracking System", display_frame)
+                if display_frame is not None:
+                    imshow("Military Tracking System", display_frame)
+                    free_put(display_frame)
 
             # Handle keyboard input
-            key = cv2.waitKey(1) & 0xFF
+            key = poll_key() & 0xFF
             if key == ord("q"):
                 break
             elif key == ord("t"):  # Toggle tracking algorithms
@@ -153,16 +192,159 @@ class TrackingSystem:
             elif key == ord("f"):  # Manual fire (when in fire zone)
                 if self.in_fire_zone and self.tracking_active:
                     print("Manual fire command!")
-                    self.arduino_comm.send_command(0, 0, 1)  # Fire laser
+                    self._send(0, 0, 1)  # Fire laser
             elif key == ord("d"):  # Toggle debug
                 self.debug = not self.debug
                 print(f"Debug mode: {'ON' if self.debug else 'OFF'}")
             elif key == ord("c"):  # Center servos
                 print("Centering servos...")
-                self.arduino_comm.send_command(0, 0, 0)
+                self._send(0, 0, 0)
 
+        self.running = False
+        track_thread.join()
         self.cleanup()
 
+        # Surface a tracking thread failure instead of leaving it unnoticed
+        if self._track_error is not None:
+            raise self._track_error
+
+    def _track_loop(self):
+        """Run _track_frames, keeping any exception for run() to re-raise"""
+        try:
+            self._track_frames()
+        except Exception as e:
+            print(f"ERROR: Tracking thread stopped: {e}")
+            self._track_error = e
+
+    def _track_frames(self):
+        """Tracker update, PID and Arduino commands for every new frame"""
+        get_frame = self.camera.get_frame
+        free_get = self._free_bufs.get_nowait
+        free_put = self._free_bufs.put
+        render_queue = self.render_queue
+
+        while self.running:
+            frame = get_frame()
+            if frame is None:
+                continue
+
+            # One monotonic timestamp per frame for FPS, fire zone and PID
+            now = time.monotonic()
+
+            # Calculate FPS
+            self.calculate_fps(now)
+
+            with self._state_lock:
+                self.process_tracking(frame, now)
+                state = (
+                    self.target_bbox,
+                    self._current_algo_name,
+                    self.tracking_active,
+                    self.in_fire_zone,
+                )
+
+            # Copy into a recycled buffer, the camera slot is reused next frame
+            try:
+                display_frame = free_get()
+                if display_frame.shape != frame.shape:
+                    display_frame = np.empty_like(frame)
+            except queue.Empty:
+                display_frame = np.empty_like(frame)
+            np.copyto(display_frame, frame)
+
+            # Newest wins: replace a frame the render loop has not picked up yet
+            try:
+                free_put(render_queue.get_nowait()[0])
+            except queue.Empty:
+                pass
+            render_queue.put((display_frame,) + state)
+
+            if self.debug and self.frame_count % 30 == 0:
+                print(
+                    f"Render queue depth: {render_queue.qsize()}, "
+                    f"free buffers: {self._free_bufs.qsize()}"
+                )
+
+    def process_tracking(self, frame, now):
+        """Update the tracker on `frame` and drive the servos/laser"""
+        if not (self.tracking_active and self.current_tracker):
+            return
+
+        bbox = self.target_bbox
+        if self.last_error is None or self.frame_count % self.track_every == 0:
+            success, bbox = self.current_tracker.update(self._tracker_input(frame))
+            if not success:
+                if self.debug:
+                    print("Tracking failed - target lost")
+                self.tracking_active = False
+                self.target_bbox = None
+                self.in_fire_zone = False
+                self.fire_zone_time = 0
+                self.last_error = None
+                # Send stop command when tracking fails
+                self._send(0, 0, 0)
+                return
+
+            bbox = self._from_small(bbox)
+            self.target_bbox = bbox
+            # Calculate error and send to Arduino
+            error_x, error_y = self.calculate_error(bbox, frame.shape)
+
+            # Per-frame error velocity, used to predict the skipped frames
+            if self.last_error is not None:
+                frames = max(1, self.frame_count - self.last_track_frame)
+                self.last_error_vel = (
+                    (error_x - self.last_error[0]) / frames,
+                    (error_y - self.last_error[1]) / frames,
+                )
+            self.last_error = (error_x, error_y)
+            self.last_track_frame = self.frame_count
+        else:
+            # Tracker skipped this frame, extrapolate the last measured error
+            # by the number of frames since it was measured
+            frames = self.frame_count - self.last_track_frame
+            error_x = self.last_error[0] + self.last_error_vel[0] * frames
+            error_y = self.last_error[1] + self.last_error_vel[1] * frames
+
+        # Check if target is in fire zone (squared distance, no sqrt)
+        threshold = self.fire_zone_threshold
+        dist_sq = error_x * error_x + error_y * error_y
+        self.in_fire_zone = dist_sq < threshold * threshold
+
+        # Track time in fire zone
+        if self.in_fire_zone:
+            if self.fire_zone_time == 0:
+                self.fire_zone_time = now
+
+            # Check if we've been in fire zone long enough
+            time_in_zone = now - self.fire_zone_time
+            if time_in_zone > self.min_fire_zone_time:
+                laser = 1  # Fire!
+            else:
+                laser = 0
+        else:
+            self.fire_zone_time = 0
+            laser = 0
+
+        # Send PID commands, a zero move inside the deadband. The PID is still
+        # updated there so its error history stays current, otherwise leaving
+        # the deadband would kick the derivative against a stale sample.
+        pan, tilt = self.pid_controller.update(error_x, error_y, now)
+        deadband = self.pid_deadband
+        if dist_sq < deadband * deadband:
+            pan, tilt = 0.0, 0.0
+
+        # Console output is slow (especially on Windows), log every 30 frames
+        if self.debug and self.frame_count % 30 == 0:
+            print(
+                f"Tracking frame {self.frame_count}: "
+                f"{self._current_algo_name} - BBox: {bbox} "
+                f"Error: ({error_x:.1f}, {error_y:.1f}), "
+                f"PID Out: ({pan:.2f}°, {tilt:.2f}°), "
+                f"Fire Zone: {self.in_fire_zone}, Laser: {laser}"
+            )
+        self._send(pan, tilt, laser)
+
     def mouse_callback(self, event, x, y, flags, param):
         if event == cv2.EVENT_LBUTTONDOWN:
             if self.debug:
@@ -178,8 +360,9 @@ class TrackingSystem:
             self.selection_start = (x, y)
             self.selection_end = (x, y)
 
-            # Reset HUD acquisition time for new target
-            self.hud.acquisition_start_time = None
+            # Reset HUD acquisition time for new target. The HUD worker owns
+            # that state, so the reset rides along with the next draw.
+            self._reset_hud_acquisition = True
 
         elif event == cv2.EVENT_MOUSEMOVE:
             if self.selecting:
@@ -228,53 +411,62 @@ class TrackingSystem:
         h = max(10, min(h, height - y))
         bbox = (x, y, w, h)
 
-        # Create new tracker
-        algorithm = self.algorithms[self.current_algorithm_idx]
-        self.current_tracker = self.tracker_factory.create_tracker(algorithm)
+        # Swap the tracker while the tracking thread is not using it
+        with self._state_lock:
+            # Create new tracker
+            algorithm = self._current_algo_name
+            self.current_tracker = self.tracker_factory.create_tracker(algorithm)
 
-        try:
-            # Initialize tracker
-            self.current_tracker.init(frame, bbox)
+            try:
+                # Initialize tracker
+                self.current_tracker.init(
+                    self._tracker_input(frame), self._to_small(bbox)
+                )
 
-            # Set tracking state
-            self.target_bbox = bbox
-            self.tracking_active = True
-            self.in_fire_zone = False
-            self.fire_zone_time = 0
+                # Set tracking state
+                self.target_bbox = bbox
+                self.tracking_active = True
+                self.in_fire_zone = False
+                self.fire_zone_time = 0
 
-            # IMPORTANT: Reset PID controller for new target
-            self.pid_controller.reset()
+                # IMPORTANT: Reset PID controller for new target
+                self.pid_controller.reset()
+                self.last_error = None
+                self.last_error_vel = (0.0, 0.0)
 
-            if self.debug:
-                print(f"✓ Target locked successfully")
-                print(f"✓ Using {algorithm} tracker")
-                print(f"✓ PID controller reset")
+                if self.debug:
+                    print(f"✓ Target locked successfully")
+                    print(f"✓ Using {algorithm} tracker")
+                    print(f"✓ PID controller reset")
 
-        except Exception as e:
-            print(f"ERROR: Failed to initialize tracker: {e}")
-            self.tracking_active = False
-            self.target_bbox = None
-            self.current_tracker = None
+            except Exception as e:
+                print(f"ERROR: Failed to initialize tracker: {e}")
+                self.tracking_active = False
+                self.target_bbox = None
+                self.current_tracker = None
 
     def stop_tracking(self):
         """Stop current tracking"""
         if self.debug and self.tracking_active:
             print("Stopping current tracking...")
 
-        self.tracking_active = False
-        self.target_bbox = None
-        self.current_tracker = None
-        self.selecting = False
-        self.selection_start = None
-        self.selection_end = None
-        self.in_fire_zone = False
-        self.fire_zone_time = 0
+        with self._state_lock:
+            self.tracking_active = False
+            self.target_bbox = None
+            self.current_tracker = None
+            self.selecting = False
+            self.selection_start = None
+            self.selection_end = None
+            self.in_fire_zone = False
+            self.fire_zone_time = 0
 
-        # Reset PID controller
-        self.pid_controller.reset()
+            # Reset PID controller and the error extrapolation
+            self.pid_controller.reset()
+            self.last_error = None
+            self.last_error_vel = (0.0, 0.0)
 
-        # Send stop command to Arduino (center servos and turn off laser)
-        self.arduino_comm.send_command(0, 0, 0)
+            # Send stop command to Arduino (center servos and turn off laser)
+            self._send(0, 0, 0)
 
         # Clear any pending commands
         time.sleep(0.05)
@@ -285,58 +477,98 @@ class TrackingSystem:
             print("✓ Laser off")
 
     def switch_algorithm(self):
-        self.current_algorithm_idx = (self.current_algorithm_idx + 1) % len(
-            self.algorithms
+        with self._state_lock:
+            self.current_algorithm_idx = (self.current_algorithm_idx + 1) % len(
+                self.algorithms
+            )
+            self._current_algo_name = self.algorithms[self.current_algorithm_idx]
+            if self.tracking_active and self.target_bbox:
+                # Reinitialize with new algorithm
+                algorithm = self._current_algo_name
+                self.current_tracker = self.tracker_factory.create_tracker(algorithm)
+                frame = self.camera.get_current_frame()
+                if frame is not None:
+                    try:
+                        self.current_tracker.init(
+                            self._tracker_input(frame),
+                            self._to_small(self.target_bbox),
+                        )
+                        # Reset PID when switching algorithms
+                        self.pid_controller.reset()
+                        self.last_error = None
+                        self.last_error_vel = (0.0, 0.0)
+                        print(f"Switched to {algorithm} tracker")
+                    except Exception as e:
+                        print(f"Failed to switch tracker: {e}")
+                        self.stop_tracking()
+            else:
+                print(f"Algorithm set to: {self._current_algo_name}")
+
+    def _small(self, frame):
+        """Downscale `frame` for the tracker into a reused buffer"""
+        h, w = frame.shape[:2]
+        size = (int(w * self.track_scale), int(h * self.track_scale))
+        # cv2 reuses dst when its shape matches, otherwise it allocates a new one
+        self._small_buf = cv2.resize(
+            frame, size, dst=self._small_buf, interpolation=cv2.INTER_AREA
         )
-        if self.tracking_active and self.target_bbox:
-            # Reinitialize with new algorithm
-            algorithm = self.algorithms[self.current_algorithm_idx]
-            self.current_tracker = self.tracker_factory.create_tracker(algorithm)
-            frame = self.camera.get_current_frame()
-            if frame is not None:
-                try:
-                    self.current_tracker.init(frame, self.target_bbox)
-                    # Reset PID when switching algorithms
-                    self.pid_controller.reset()
-                    print(f"Switched to {algorithm} tracker")
-                except Exception as e:
-                    print(f"Failed to switch tracker: {e}")
-                    self.stop_tracking()
-        else:
-            print(f"Algorithm set to: {self.algorithms[self.current_algorithm_idx]}")
+        return self._small_buf
+
+    def _tracker_input(self, frame):
+        """Downscaled frame, grayscale for trackers that do not use color"""
+        small = self._small(frame)
+        if self._current_algo_name in GRAY_TRACKERS:
+            small = self._gray_buf = cv2.cvtColor(
+                small, cv2.COLOR_BGR2GRAY, dst=self._gray_buf
+            )
+        return cv2.UMat(small) if self.use_opencl else small
+
+    def _to_small(self, bbox):
+        s = self.track_scale
+        x, y, w, h = bbox
+        return (int(x * s), int(y * s), max(1, int(w * s)), max(1, int(h * s)))
+
+    def _from_small(self, bbox):
+        s = 1.0 / self.track_scale
+        x, y, w, h = bbox
+        return (int(x * s), int(y * s), int(w * s), int(h * s))
 
     def reset_tracking(self):
         """Complete reset of the tracking system"""
         self.stop_tracking()
         # Additional reset for Arduino
-        self.arduino_comm.send_command(0, 0, 0)
+        self._send(0, 0, 0)
         print("Tracking system reset")
 
     def calculate_error(self, bbox, frame_shape):
         """Calculate pixel error from center of frame"""
         target_center_x = bbox[0] + bbox[2] / 2
         target_center_y = bbox[1] + bbox[3] / 2
-        frame_center_x = frame_shape[1] / 2
-        frame_center_y = frame_shape[0] / 2
+        # Frame center only changes with the frame size
+        if frame_shape != self._center_shape:
+            self._center_shape = frame_shape
+            self._frame_center = (frame_shape[1] / 2, frame_shape[0] / 2)
+        frame_center_x, frame_center_y = self._frame_center
 
         error_x = target_center_x - frame_center_x
         error_y = target_center_y - frame_center_y
 
         return error_x, error_y
 
-    def calculate_fps(self):
+    def calculate_fps(self, now):
         self.frame_count += 1
         if self.frame_count % 30 == 0:
-            current_time = time.time()
-            self.fps = 30 / (current_time - self.last_time)
-            self.last_time = current_time
+            self.fps = 30 / (now - self.last_time)
+            self.last_time = now
 
     def cleanup(self):
         print("\nShutting down system...")
         self.stop_tracking()
         time.sleep(0.1)  # Give time for final commands
+        self.hud.close()
         self.camera.release()
-        self.arduino_comm.close()
+        if self.arduino_comm is not None:
+            self.arduino_comm.close()
         cv2.destroyAllWindows()
         print("System shutdown complete")
 
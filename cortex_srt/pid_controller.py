@@ -1,6 +1,19 @@
 import time
 from collections import deque
 
+from _jit import njit
+
+
+@njit(cache=True)
+def _pid_step(kp, ki, kd, err_x, err_y, prev_x, prev_y, sum_x, sum_y, dpx, dpy, lo, hi):
+    """Constrained pan/tilt degrees from the PID outputs (pixels)"""
+    px = (kp * err_x + ki * sum_x + kd * (err_x - prev_x)) * dpx
+    py = (kp * err_y + ki * sum_y + kd * (err_y - prev_y)) * dpy
+    # Inline clamps, cheaper than min/max calls when numba is not available
+    px = lo if px < lo else hi if px > hi else px
+    py = lo if py < lo else hi if py > hi else py
+    return px, py
+
 
 class PIDController:
     def __init__(self, kp=0.085, ki=0.0000, kd=0.04, integral_window=100):
@@ -14,58 +27,63 @@ class PIDController:
         self.integral_window = integral_window
         self.integral_x = deque(maxlen=integral_window)
         self.integral_y = deque(maxlen=integral_window)
+        # Running sums of the error windows, updated as errors enter/leave
+        self._sum_x = 0.0
+        self._sum_y = 0.0
 
-        self.last_time = time.time()
+        self.last_time = time.monotonic()
 
         self.max_output = 8
         self.min_output = -8
 
-    def update(self, error_x, error_y):
-        current_time = time.time()
-        dt = current_time - self.last_time
-        if dt <= 0:
-            dt = 0.001
-
-        # Append current errors
-        self.integral_x.append(error_x)
-        self.integral_y.append(error_y)
+        # Pixel error to degrees: camera FOV over the (rotated) frame size
+        self.degrees_per_pixel_x = 70.0 / 720
+        self.degrees_per_pixel_y = 120.0 / 1280
 
-        # Integral is the sum of the error queue
-        integral_sum_x = sum(self.integral_x)
-        integral_sum_y = sum(self.integral_y)
+        # Compile _pid_step now rather than on the first tracked frame
+        _pid_step(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 1.0, -1.0, 1.0)
 
-        # Derivative is change in error
-        derivative_x = error_x - self.prev_error_x
-        derivative_y = error_y - self.prev_error_y
+    def update(self, error_x, error_y, now=None):
+        # `now` is a time.monotonic() timestamp, shared with the caller's frame
+        current_time = time.monotonic() if now is None else now
 
-        # PID output
-        output_x = self.kp * error_x + self.ki * integral_sum_x + self.kd * derivative_x
-        output_y = self.kp * error_y + self.ki * integral_sum_y + self.kd * derivative_y
+        # Append current errors, dropping the oldest one from the sums first
+        if len(self.integral_x) == self.integral_window:
+            self._sum_x -= self.integral_x[0]
+            self._sum_y -= self.integral_y[0]
+        self.integral_x.append(error_x)
+        self.integral_y.append(error_y)
+        self._sum_x += error_x
+        self._sum_y += error_y
+
+        # PID output: integral is the sum of the error queue, derivative is
+        # the change in error
+        pan_degrees, tilt_degrees = _pid_step(
+            float(self.kp),
+            float(self.ki),
+            float(self.kd),
+            float(error_x),
+            float(error_y),
+            float(self.prev_error_x),
+            float(self.prev_error_y),
+            float(self._sum_x),
+            float(self._sum_y),
+            self.degrees_per_pixel_x,
+            self.degrees_per_pixel_y,
+            float(self.min_output),
+            float(self.max_output),
+        )
 
         self.prev_error_x = error_x
         self.prev_error_y = error_y
         self.last_time = current_time
-
-        degrees_per_pixel_x = 70.0 / 720
-        degrees_per_pixel_y = 120.0 / 1280
-
-        pan_degrees = self.constrain(
-            output_x * degrees_per_pixel_x, self.min_output, self.max_output
-        )
-        tilt_degrees = self.constrain(
-            output_y * degrees_per_pixel_y, self.min_output, self.max_output
-        )
-        print(
-            f"PID Output: Pan={pan_degrees:.2f}°, Tilt={tilt_degrees:.2f}° Output X={output_x:.2f}, Output Y={output_y:.2f}"
-        )
         return pan_degrees, tilt_degrees
 
-    def constrain(self, value, min_val, max_val):
-        return max(min_val, min(value, max_val))
-
     def reset(self):
         self.prev_error_x = 0
         self.prev_error_y = 0
         self.integral_x.clear()
         self.integral_y.clear()
-        self.last_time = time.time()
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self.last_time = time.monotonic()
@@ -7,6 +7,7 @@ Usage: python run_system.py [--port COM3] [--camera 0] [--rotate 90]
 
 import argparse
 import sys
+import cv2
 from main import TrackingSystem
 
 
@@ -22,8 +23,16 @@ def main():
         help="Camera rotation angle (default: 90 for vertical)",
     )
     parser.add_argument("--no-arduino", action="store_true", help="Run without Arduino")
+    parser.add_argument(
+        "--opencl", action="store_true", help="Run tracker updates through OpenCL"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=None, help="OpenCV worker threads (VIT/DNN)"
+    )
 
     args = parser.parse_args()
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
 
     print("===========================================")
     print("   MILITARY TRACKING SYSTEM v1.0")
@@ -49,11 +58,16 @@ def main():
     print("  3. MIL - Good for partial occlusions")
     print("  4. MOSSE - Very fast, lower accuracy")
     print("  5. MedianFlow - Good for predictable motion")
+    print("  6. VIT - Learned tracker, needs OpenCV 4.9+ and vittrack.onnx")
     print("===========================================\n")
 
     try:
         system = TrackingSystem(
-            camera_index=args.camera, camera_rotate=args.rotate, arduino_port=args.port
+            camera_index=args.camera,
+            camera_rotate=args.rotate,
+            arduino_port=args.port,
+            use_arduino=not args.no_arduino,
+            use_opencl=args.opencl,
         )
         system.run()
     except KeyboardInterrupt:
@@ -3,16 +3,67 @@ import time
 import numpy as np
 from collections import deque
 
+from _jit import njit
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _iou_scalar(x1, y1, w1, h1, x2, y2, w2, h2):
+    # Disjoint on either axis (the usual case after a track is lost)
+    if x1 + w1 <= x2 or x2 + w2 <= x1 or y1 + h1 <= y2 or y2 + h2 <= y1:
+        return 0.0
+
+    # Calculate intersection
+    xi1 = max(x1, x2)
+    yi1 = max(y1, y2)
+    xi2 = min(x1 + w1, x2 + w2)
+    yi2 = min(y1 + h1, y2 + h2)
+
+    if xi2 <= xi1 or yi2 <= yi1:
+        return 0.0
+
+    intersection_area = (xi2 - xi1) * (yi2 - yi1)
+
+    # Calculate union
+    box1_area = w1 * h1
+    box2_area = w2 * h2
+    union_area = box1_area + box2_area - intersection_area
+
+    return intersection_area / union_area
+
+
+# Compile at import so the first evaluated frame doesn't pay the JIT latency
+_iou_scalar(0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 1.0)
+
+
 class TrackerAnalytics:
     def __init__(self, window_size=100):
         self.window_size = window_size
         self.fps_history = deque(maxlen=window_size)
         self.accuracy_history = deque(maxlen=window_size)
+        # Running sums over the history windows, for O(1) means
+        self._fps_sum = 0.0
+        self._accuracy_sum = 0.0
         self.tracking_time = {}
         self.algorithm_stats = {}
+        # Bumped whenever algorithm_stats changes, get_report caches on it
+        self._version = 0
+        self._report_cache = (None, -1)
         
+    @property
+    def mean_fps(self):
+        return self._fps_sum / len(self.fps_history) if self.fps_history else 0
+
+    @property
+    def mean_accuracy(self):
+        if not self.accuracy_history:
+            return 0
+        return self._accuracy_sum / len(self.accuracy_history)
+
     def update_fps(self, fps):
+        if len(self.fps_history) == self.window_size:
+            self._fps_sum -= self.fps_history[0]
         self.fps_history.append(fps)
+        self._fps_sum += fps
         
     def update_accuracy(self, ground_truth_bbox, predicted_bbox):
         """Calculate IoU (Intersection over Union) for accuracy"""
@@ -20,57 +71,76 @@ class TrackerAnalytics:
             return
             
         iou = self.calculate_iou(ground_truth_bbox, predicted_bbox)
+        if len(self.accuracy_history) == self.window_size:
+            self._accuracy_sum -= self.accuracy_history[0]
         self.accuracy_history.append(iou)
+        self._accuracy_sum += iou
         
+    @classmethod
+    def calculate_iou_batch(cls, boxes1, boxes2):
+        """IoU matrix (N, M) for (N, 4) and (M, 4) boxes in xywh"""
+        boxes1 = np.asarray(boxes1, dtype=np.float32).reshape(-1, 4)
+        boxes2 = np.asarray(boxes2, dtype=np.float32).reshape(-1, 4)
+
+        # xywh -> upper-left / bottom-right corners
+        ul1, br1 = boxes1[:, :2], boxes1[:, :2] + boxes1[:, 2:]
+        ul2, br2 = boxes2[:, :2], boxes2[:, :2] + boxes2[:, 2:]
+
+        inter_ul = np.maximum(ul1[:, None, :], ul2)
+        inter_br = np.minimum(br1[:, None, :], br2)
+        wh = np.clip(inter_br - inter_ul, 0, None)
+        inter = wh[..., 0] * wh[..., 1]
+
+        area1 = boxes1[:, 2] * boxes1[:, 3]
+        area2 = boxes2[:, 2] * boxes2[:, 3]
+        union = area1[:, None] + area2 - inter
+        return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
     def calculate_iou(self, bbox1, bbox2):
         x1, y1, w1, h1 = bbox1
         x2, y2, w2, h2 = bbox2
-        
-        # Calculate intersection
-        xi1 = max(x1, x2)
-        yi1 = max(y1, y2)
-        xi2 = min(x1 + w1, x2 + w2)
-        yi2 = min(y1 + h1, y2 + h2)
-        
-        if xi2 <= xi1 or yi2 <= yi1:
-            return 0.0
-            
-        intersection_area = (xi2 - xi1) * (yi2 - yi1)
-        
-        # Calculate union
-        box1_area = w1 * h1
-        box2_area = w2 * h2
-        union_area = box1_area + box2_area - intersection_area
-        
-        return intersection_area / union_area
+        # Plain floats keep numba to a single compiled signature
+        return _iou_scalar(
+            float(x1), float(y1), float(w1), float(h1),
+            float(x2), float(y2), float(w2), float(h2),
+        )
         
     def start_tracking(self, algorithm):
-        self.tracking_time[algorithm] = time.time()
+        # Stats are created here so end_tracking never has to check for them
+        self.algorithm_stats.setdefault(algorithm, {
+            'total_time': 0,
+            'count': 0,
+            'avg_fps': 0,
+            'avg_accuracy': 0
+        })
+        self.tracking_time[algorithm] = time.perf_counter()
         
     def end_tracking(self, algorithm):
         if algorithm in self.tracking_time:
-            duration = time.time() - self.tracking_time[algorithm]
-            if algorithm not in self.algorithm_stats:
-                self.algorithm_stats[algorithm] = {
-                    'total_time': 0,
-                    'count': 0,
-                    'avg_fps': 0,
-                    'avg_accuracy': 0
-                }
-            
+            duration = time.perf_counter() - self.tracking_time[algorithm]
             stats = self.algorithm_stats[algorithm]
             stats['total_time'] += duration
             stats['count'] += 1
-            stats['avg_fps'] = np.mean(self.fps_history) if self.fps_history else 0
-            stats['avg_accuracy'] = np.mean(self.accuracy_history) if self.accuracy_history else 0
+            stats['avg_fps'] = self.mean_fps
+            stats['avg_accuracy'] = self.mean_accuracy
+            self._version += 1
             
     def get_report(self):
-        report = "=== Tracking Algorithm Performance Report ===\n"
+        report, version = self._report_cache
+        if version == self._version:
+            return report
+
+        parts = ["=== Tracking Algorithm Performance Report ==="]
         for algorithm, stats in self.algorithm_stats.items():
-            report += f"\nAlgorithm: {algorithm}\n"
-            report += f"  Average FPS: {stats['avg_fps']:.2f}\n"
-            report += f"  Average Accuracy (IoU): {stats['avg_accuracy']:.2%}\n"
-            report += f"  Total Tracking Time: {stats['total_time']:.2f}s\n"
-            report += f"  Number of Sessions: {stats['count']}\n"
-            
-        return report
\ No newline at end of file
+            if not stats['count']:
+                continue  # Started but no session finished yet
+            parts.append(
+                f"\nAlgorithm: {algorithm}\n"
+                f"  Average FPS: {stats['avg_fps']:.2f}\n"
+                f"  Average Accuracy (IoU): {stats['avg_accuracy']:.2%}\n"
+                f"  Total Tracking Time: {stats['total_time']:.2f}s\n"
+                f"  Number of Sessions: {stats['count']}"
+            )
+        report = "\n".join(parts) + "\n"
+        self._report_cache = (report, self._version)
+        return report
@@ -1,24 +1,51 @@
 # tracker_factory.py
+import os
 import cv2
 
+# ONNX model for the VIT tracker (OpenCV 4.9+), e.g. vitTracker.onnx from
+# the opencv_zoo repository
+VIT_MODEL = os.environ.get(
+    "VIT_MODEL", os.path.join(os.path.dirname(__file__), "vittrack.onnx")
+)
+
+
+def _resolve(name):
+    # Prefer the legacy module (MOSSE only lives there on OpenCV 4.5+)
+    legacy = getattr(cv2, "legacy", None)
+    return getattr(legacy, name, None) or getattr(cv2, name, None)
+
+
+def _vit_create():
+    params = cv2.TrackerVit_Params()
+    params.net = VIT_MODEL
+    params.backend = cv2.dnn.DNN_BACKEND_OPENCV
+    params.target = cv2.dnn.DNN_TARGET_CPU
+    return cv2.TrackerVit_create(params)
+
+
+# Constructors are resolved once at import, missing ones are None
+_CTORS = {
+    "CSRT": getattr(cv2, "TrackerCSRT_create", None),
+    "KCF": getattr(cv2, "TrackerKCF_create", None),
+    "MIL": getattr(cv2, "TrackerMIL_create", None),
+    "MOSSE": _resolve("TrackerMOSSE_create"),
+    "VIT": (
+        _vit_create
+        if hasattr(cv2, "TrackerVit_create") and os.path.exists(VIT_MODEL)
+        else None
+    ),
+}
+
 
 class TrackerFactory:
+    def is_available(self, algorithm: str):
+        return _CTORS.get(algorithm) is not None
+
     def create_tracker(self, algorithm: str):
         """Factory method to create different trackers"""
-        if algorithm == "CSRT":
-            return cv2.TrackerCSRT_create()
-        elif algorithm == "KCF":
-            return cv2.TrackerKCF_create()
-        elif algorithm == "MIL":
-            return cv2.TrackerMIL_create()
-        elif algorithm == "MOSSE":
-            # Try legacy MOSSE first, then fall back to regular
-            try:
-                return cv2.legacy.TrackerMOSSE_create()
-            except AttributeError:
-                try:
-                    return cv2.TrackerMOSSE_create()
-                except AttributeError:
-                    raise ValueError(f"MOSSE tracker not available in this OpenCV version")
-        else:
-            raise ValueError(f"Unknown tracking algorithm: {algorithm}")
+        ctor = _CTORS.get(algorithm)
+        if ctor is not None:
+            return ctor()
+        if algorithm in _CTORS:
+            raise ValueError(f"{algorithm} tracker not available in this OpenCV version")
+        raise ValueError(f"Unknown tracking algorithm: {algorithm}")